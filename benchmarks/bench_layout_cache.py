@@ -0,0 +1,102 @@
+"""
+歌词测量缓存基准测试。
+
+在模拟的歌曲库上逐行"播放"，对比每次切换都新建 QFontMetrics 测量与
+使用 LyricLayoutCache 的耗时和命中率。
+
+从设备在歌词到达前并不知道下一行，因此主要结果是不预热的情况，
+只有副歌等重复出现的歌词能命中缓存；预热后两行的结果仅作为理想上限。
+
+运行::
+
+    uv run python -m benchmarks.bench_layout_cache
+"""
+import os
+import random
+import time
+
+from PyQt5.QtGui import QFont, QFontMetrics
+from PyQt5.QtWidgets import QApplication
+
+from config import config
+from ui.lyricLayout import LyricLayoutCache
+
+WORDS_CN = "我们 一起 走过 春夏 秋冬 风 雨 夜空 星光 回忆 远方 等待 温柔 心跳 海 的 你 梦".split()
+WORDS_EN = "love you night light dream forever baby heart fire tonight never alone".split()
+
+
+def make_catalogue(songs: int = 200, seed: int = 0):
+    """生成歌曲库：每首 30~60 行，副歌重复出现，中英文混合"""
+    rng = random.Random(seed)
+    catalogue = []
+    for _ in range(songs):
+        words = WORDS_EN if rng.random() < 0.3 else WORDS_CN
+        sep = " " if words is WORDS_EN else ""
+
+        def line():
+            return sep.join(rng.choice(words) for _ in range(rng.randint(3, 14)))
+
+        verse = [line() for _ in range(rng.randint(12, 24))]
+        chorus = [line() for _ in range(rng.randint(4, 8))]
+        song = verse[: len(verse) // 2] + chorus + verse[len(verse) // 2:] + chorus * 2
+        catalogue.append(song)
+    return catalogue
+
+
+def bench_uncached(playlist, font: QFont, areaWidth: int) -> float:
+    start = time.perf_counter()
+    for text in playlist:
+        w = QFontMetrics(font).width(text)
+        if w > areaWidth:
+            _ = (10, areaWidth - w - 10)
+        else:
+            _ = (areaWidth - w) // 2
+    return time.perf_counter() - start
+
+
+def bench_cached(playlist, font: QFont, areaWidth: int, cache: LyricLayoutCache,
+                 lookahead: int = 0) -> float:
+    elapsed = 0.0
+    for i, text in enumerate(playlist):
+        # 只统计切换歌词时的耗时，预热发生在两次切换之间
+        start = time.perf_counter()
+        cache.layout(text, font, areaWidth)
+        elapsed += time.perf_counter() - start
+        if lookahead:
+            cache.warm(playlist[i + 1:i + 1 + lookahead], font, areaWidth)
+    return elapsed
+
+
+def main():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication([])  # noqa: F841
+
+    font = QFont(config["lyric.font-family"])
+    font.setPixelSize(config["lyric.font-size"])
+    areaWidth = 1200
+
+    # 歌曲库中随机抽取播放，部分歌曲会被重复播放
+    catalogue = make_catalogue()
+    rng = random.Random(1)
+    playlist = [line for song in rng.choices(catalogue, k=300) for line in song]
+
+    # 先测量一遍，排除字体首次加载的开销
+    bench_uncached(playlist[:200], font, areaWidth)
+    uncached = bench_uncached(playlist, font, areaWidth)
+    cache = LyricLayoutCache()
+    cached = bench_cached(playlist, font, areaWidth, cache)
+    idealCache = LyricLayoutCache()
+    ideal = bench_cached(playlist, font, areaWidth, idealCache, lookahead=2)
+
+    n = len(playlist)
+    print(f"歌词切换次数: {n}")
+    print(f"无缓存: {uncached * 1e6 / n:.1f} us/行")
+    print(f"有缓存（不预热，与应用一致）: {cached * 1e6 / n:.1f} us/行，"
+          f"命中率 {cache.hitRate:.1%}")
+    print(f"  {cache.stats()}")
+    print(f"有缓存（预热后两行，理想上限）: {ideal * 1e6 / n:.1f} us/行，"
+          f"命中率 {idealCache.hitRate:.1%}")
+
+
+if __name__ == "__main__":
+    main()
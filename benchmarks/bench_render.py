@@ -0,0 +1,159 @@
+"""
+从设备歌词渲染基准测试。
+
+模拟从设备收到的歌词序列（新歌词，以及只改了时长的重复歌词），逐条调用
+setLyric/setPlay 后运行事件循环，让动画通过 update() 驱动真实的重绘。
+通过事件过滤器统计每次切换实际发生的绘制次数，并统计路径构建次数。
+
+对比两种实现：
+
+- 改动前：每次 setLyric 都重建动画，每次绘制都重新构建歌词路径并求交
+- 改动后：当前的 LyricWidget
+
+运行::
+
+    uv run python -m benchmarks.bench_render
+"""
+import os
+import random
+
+from PyQt5.QtCore import QEvent, QObject, QEventLoop, QPointF, QTimer
+from PyQt5.QtGui import QColor, QPainter, QPainterPath, QPen
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks.bench_layout_cache import make_catalogue
+from config import config
+from ui.lyricWidget import LyricWidget, PATH_BUILDS
+
+# 新歌词的动画时长与停留时间（毫秒），停留时间长于动画以便动画播放完
+LINE_DURATION = 300
+LINE_HOLD = 400
+
+
+class LegacyLyricWidget(LyricWidget):
+    """改动前的渲染方式，仅用于对比"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pathBuilds = 0
+
+    def setLyric(self, lyric: list, duration, update=False):
+        # 不做差异比较，每行都重建动画
+        self._LyricWidget__layout = None
+        super().setLyric(lyric, duration, update)
+
+    def paintEvent(self, e):
+        if not self.lyric:
+            return
+        painter = QPainter(self)
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing)
+        font = self.lyricFont
+        painter.setFont(font)
+
+        path = QPainterPath()
+        path.addText(QPointF(self.getTextX(), config["lyric.font-size"]), font, self.lyric)
+        self.pathBuilds += 1
+        painter.strokePath(path, QPen(
+            QColor(*config["lyric.stroke-color"]), config["lyric.stroke-size"]))
+        painter.fillPath(path, QColor(*config['lyric.font-color']))
+
+        subPath = QPainterPath()
+        rect = path.boundingRect()
+        rect.setWidth(self.getMaskWidth())
+        subPath.addRect(rect)
+        painter.fillPath(path.intersected(subPath), QColor(*config['lyric.highlight-color']))
+
+
+class PaintCounter(QObject):
+    """统计部件收到的绘制事件"""
+
+    def __init__(self):
+        super().__init__()
+        self.paints = 0
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            self.paints += 1
+        return False
+
+
+def make_feed(seed: int = 2):
+    """
+    生成从设备收到的 (歌词, 时长, 停留毫秒) 序列。
+
+    约三成歌词会以不同时长再次到达，交替落在动画进行中和动画播放完后。
+    """
+    rng = random.Random(seed)
+    feed = []
+    midway = False
+    for line in make_catalogue(songs=1, seed=seed)[0]:
+        if rng.random() < 0.3:
+            midway = not midway
+            feed.append((line, LINE_DURATION, LINE_DURATION // 2 if midway else LINE_HOLD))
+            feed.append((line, LINE_DURATION + 200, LINE_HOLD))
+        else:
+            feed.append((line, LINE_DURATION, LINE_HOLD))
+    return feed
+
+
+def spin(ms: int):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
+
+
+def run(widget: LyricWidget, feed, pathBuilds):
+    """播放歌词序列，返回 {类型: [次数, 绘制次数, 路径构建次数]}"""
+    counter = PaintCounter()
+    widget.installEventFilter(counter)
+    widget.resize(1200, 110)
+    widget.show()
+    spin(100)
+
+    changes = {"新歌词": [0, 0, 0], "重复（动画进行中）": [0, 0, 0], "重复（动画已结束）": [0, 0, 0]}
+    for text, duration, hold in feed:
+        if text != widget.lyric:
+            kind = "新歌词"
+        elif widget.maskWidthAni.state() == widget.maskWidthAni.Running:
+            kind = "重复（动画进行中）"
+        else:
+            kind = "重复（动画已结束）"
+        paints, builds = counter.paints, pathBuilds()
+
+        widget.setLyric([text], [duration], update=True)
+        widget.setPlay(True)
+        spin(hold)
+
+        stat = changes[kind]
+        stat[0] += 1
+        stat[1] += counter.paints - paints
+        stat[2] += pathBuilds() - builds
+
+    widget.hide()
+    return changes
+
+
+def report(title: str, changes: dict):
+    print(title)
+    for kind, (count, paints, builds) in changes.items():
+        if count:
+            print(f"  {kind}: {count} 次，绘制 {paints / count:.1f} 次/切换，"
+                  f"路径构建 {builds / count:.1f} 次/切换")
+
+
+def main():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication([])  # noqa: F841
+
+    feed = make_feed()
+    print(f"歌词切换次数: {len(feed)}，新歌词动画 {LINE_DURATION} ms")
+
+    legacy = LegacyLyricWidget()
+    report("改动前:", run(legacy, feed, lambda: legacy.pathBuilds))
+
+    current = LyricWidget()
+    report("改动后:", run(current, feed, lambda: PATH_BUILDS.value))
+
+
+if __name__ == "__main__":
+    main()
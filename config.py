@@ -5,5 +5,17 @@ config = {
     "lyric.stroke-size": 5,
     "lyric.stroke-color": [0, 0, 0],
     "lyric.font-family": "DengXian",
-    "lyric.alignment": "Center"
+    "lyric.alignment": "Center",
+    # 本地广播桥：通过 WebSocket/SSE 向 OBS 浏览器源等本地消费者推送歌词
+    "bridge.enabled": False,
+    "bridge.host": "127.0.0.1",
+    "bridge.port": 31315,
+    # 主设备发送限流：歌词需保持不变 settle-ms 毫秒才发送，每秒最多发送 max-send-rate 个包
+    "network.settle-ms": 100,
+    "network.max-send-rate": 5,
+    "network.send-burst": 3,
+    # 本机 Prometheus 指标端点 http://127.0.0.1:31316/metrics
+    "metrics.enabled": False,
+    "metrics.host": "127.0.0.1",
+    "metrics.port": 31316
 }
\ No newline at end of file
@@ -6,9 +6,15 @@ import sys
 from ui.lyricWidget import LyricWidget
 from utils.hacktool import MemoryHookTool
 from utils.network import LyricNetwork
+from utils.bridge import LyricBridge
+from utils.throttle import LyricCoalescer
+from utils.metrics import registry, MetricsServer
+from config import config
 import logging as log
 import time
 
+LINES_DISPLAYED = registry.counter("lyricsync_lines_displayed_total", "从设备显示的歌词行数")
+
 class HoverContainerWidget(QWidget):
     closeRequested = pyqtSignal()
 
@@ -57,6 +63,8 @@ class HoverContainerWidget(QWidget):
         
         self._drag_active = False
         self._drag_pos = None
+        # 缓存的歌词子部件，子部件增删时失效
+        self._lyric_children = None
 
         # 让菜单栏接受鼠标事件
         self.menu_bar.mousePressEvent = self.menu_bar_mousePressEvent
@@ -108,9 +116,17 @@ class HoverContainerWidget(QWidget):
     def resizeEvent(self, event):
         """Called when the widget is resized."""
         super().resizeEvent(event)
-        for child in self.findChildren(LyricWidget):
+        if self._lyric_children is None:
+            self._lyric_children = self.findChildren(LyricWidget)
+        for child in self._lyric_children:
             child.resize(self.size())
 
+    def childEvent(self, event):
+        """子部件增删时使歌词子部件缓存失效"""
+        super().childEvent(event)
+        if event.added() or event.removed():
+            self._lyric_children = None
+
     def menu_bar_mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self._drag_active = True
@@ -133,6 +149,7 @@ class Demo(QWidget):
         self.refresh_interval = 300
         self.is_master = False
         self.last_lyric = None
+        self.last_duration = None
         self.last_lyric_time = 0
 
         # 创建系统托盘
@@ -141,6 +158,8 @@ class Demo(QWidget):
         
         # 创建托盘菜单
         self.tray_menu = QMenu()
+        self.metrics_action = self.tray_menu.addAction("运行指标")
+        self.metrics_action.triggered.connect(self.showMetrics)
         self.quit_action = self.tray_menu.addAction("退出")
         self.quit_action.triggered.connect(self.close)
         
@@ -149,11 +168,25 @@ class Demo(QWidget):
         self.tray_icon.show()
 
         self.init_network()
+        if config["metrics.enabled"]:
+            self.metrics_server = MetricsServer(config["metrics.host"], config["metrics.port"])
+            if not self.metrics_server.start():
+                log.warning("指标服务启动失败，仅可通过托盘菜单查看运行指标")
         if self.is_master:
             self.hookTool = MemoryHookTool(
                 process_name = "kwmusic.exe",
                 dll_name="UIDeskLyric.dll"
             )
+            # 发送前合并未稳定的歌词并限速
+            self.coalescer = LyricCoalescer(
+                settle=config["network.settle-ms"] / 1000,
+                rate=config["network.max-send-rate"],
+                burst=config["network.send-burst"]
+            )
+            # 待发送歌词稳定后提前再读一次，而不是等下一个刷新周期
+            self.flush_timer = QTimer(self)
+            self.flush_timer.setSingleShot(True)
+            self.flush_timer.timeout.connect(self.updateLyric)
             self.timer = QTimer(self)
             self.timer.timeout.connect(self.updateLyric)
             self.timer.start(self.refresh_interval)
@@ -186,6 +219,13 @@ class Demo(QWidget):
             self.network = LyricNetwork()
             if not self.network.init_network(self.is_master):
                 raise Exception("网络初始化失败")
+
+            if config["bridge.enabled"]:
+                self.bridge = LyricBridge(config["bridge.host"], config["bridge.port"])
+                if self.bridge.start():
+                    self.network.bridge = self.bridge
+                else:
+                    log.warning("歌词广播桥启动失败，本地叠加层将不可用")
             
             if not self.is_master:
                 log.info("已设置为从设备模式，等待接收歌词...")
@@ -233,22 +273,42 @@ class Demo(QWidget):
         """定时更新歌词"""
         if self.is_master:
             new_lyric = self.load_lyric_mem()
-            if new_lyric and new_lyric != self.last_lyric:
-                self.last_lyric = new_lyric
-                self.network.send_lyric(new_lyric)
+            if new_lyric:
+                self.coalescer.submit(new_lyric)
+            lyric = self.coalescer.poll()
+            if lyric:
+                self.last_lyric = lyric
+                self.network.send_lyric(lyric)
+                log.debug(f"发送统计: {self.coalescer.stats()}")
+            delay = self.coalescer.next_deadline()
+            if delay is not None:
+                self.flush_timer.start(int(delay * 1000) + 1)
         else:
             result = self.load_lyric_net()
             if result:
                 lyric, duration = result
-                if lyric != self.last_lyric:
+                # 歌词和时长都没变时跳过，只有时长变化时由 setLyric 重新计时
+                if (lyric, duration) != (self.last_lyric, self.last_duration):
                     self.last_lyric = lyric
+                    self.last_duration = duration
+                    LINES_DISPLAYED.inc()
                     self.lyricWidget.setLyric([lyric], [duration], update=True)
                     self.lyricWidget.setPlay(True)
 
+    def showMetrics(self):
+        """在对话框中显示运行指标"""
+        QMessageBox.information(self, '运行指标', registry.summary())
+
     def closeEvent(self, event):
         """关闭窗口时清理资源"""
+        if hasattr(self, 'coalescer'):
+            log.info(f"发送统计: {self.coalescer.stats()}")
         if hasattr(self, 'network'):
             self.network.close()
+        if hasattr(self, 'bridge'):
+            self.bridge.close()
+        if hasattr(self, 'metrics_server'):
+            self.metrics_server.close()
         if hasattr(self, 'tray_icon'):
             self.tray_icon.hide()
         super().closeEvent(event)
@@ -0,0 +1,181 @@
+import base64
+import hashlib
+import json
+import socket
+import struct
+import time
+from typing import Tuple
+
+import pytest
+
+from utils.bridge import LyricBridge, WS_GUID, encode_ws_frame
+
+WS_KEY = b"dGhlIHNhbXBsZSBub25jZQ=="
+
+
+@pytest.fixture
+def bridge():
+    bridge = LyricBridge(port=0)
+    assert bridge.start()
+    yield bridge
+    bridge.close()
+
+
+def connect(bridge, request: bytes, rcvbuf: int = 0) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if rcvbuf:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.settimeout(2)
+    sock.connect(("127.0.0.1", bridge.port))
+    sock.sendall(request)
+    return sock
+
+
+def recv_until(sock: socket.socket, marker: bytes, data: bytes = b"") -> bytes:
+    """读取直到出现 marker，data 为之前已读到但尚未消费的字节"""
+    while marker not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def wait_for(condition, timeout: float = 2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "等待超时"
+        time.sleep(0.01)
+
+
+def split_head(sock: socket.socket) -> Tuple[bytes, bytes]:
+    """读取响应头，返回 (响应头, 同一次读取中跟在头后面的字节)"""
+    head, _, rest = recv_until(sock, b"\r\n\r\n").partition(b"\r\n\r\n")
+    return head, rest
+
+
+def open_sse(bridge) -> Tuple[socket.socket, bytes]:
+    sock = connect(bridge, b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    head, rest = split_head(sock)
+    assert b"text/event-stream" in head
+    return sock, rest
+
+
+def open_ws(bridge) -> Tuple[socket.socket, bytes]:
+    sock = connect(
+        bridge,
+        b"GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+        b"Connection: Upgrade\r\nSec-WebSocket-Key: " + WS_KEY + b"\r\n\r\n",
+    )
+    head, rest = split_head(sock)
+    accept = base64.b64encode(hashlib.sha1(WS_KEY + WS_GUID).digest())
+    assert head.startswith(b"HTTP/1.1 101")
+    assert b"Sec-WebSocket-Accept: " + accept in head
+    return sock, rest
+
+
+def client_frame(opcode: int, payload: bytes) -> bytes:
+    mask = b"\x01\x02\x03\x04"
+    masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return bytes([0x80 | opcode, 0x80 | len(payload)]) + mask + masked
+
+
+def test_publish_fans_out_to_sse_and_ws(bridge):
+    sse, sse_rest = open_sse(bridge)
+    ws, ws_rest = open_ws(bridge)
+    wait_for(lambda: len(bridge.subscribers) == 2)
+
+    payload = json.dumps({"lyric": "你好", "duration": 3000}).encode()
+    bridge.publish(payload)
+
+    assert recv_until(sse, b"\n\n", sse_rest) == b"data: " + payload + b"\n\n"
+    assert recv_until(ws, payload, ws_rest) == encode_ws_frame(payload)
+
+
+def test_new_subscriber_receives_current_line(bridge):
+    bridge.publish(b'{"lyric": "a", "duration": 1}')
+    wait_for(lambda: bridge.current is not None)
+
+    # 当前歌词常与响应头在同一次读取中到达
+    sse, rest = open_sse(bridge)
+    assert recv_until(sse, b"\n\n", rest) == b'data: {"lyric": "a", "duration": 1}\n\n'
+
+
+def test_lyric_endpoint_returns_current_line(bridge):
+    bridge.publish(b'{"lyric": "a", "duration": 1}')
+    wait_for(lambda: bridge.current is not None)
+
+    sock = connect(bridge, b"GET /lyric HTTP/1.1\r\n\r\n")
+    response = recv_until(sock, b"}")
+    assert response.startswith(b"HTTP/1.1 200")
+    assert response.endswith(b'{"lyric": "a", "duration": 1}')
+
+
+def test_slow_reader_drops_to_latest(bridge):
+    slow = connect(bridge, b"GET /events HTTP/1.1\r\n\r\n", rcvbuf=4096)
+    wait_for(lambda: len(bridge.subscribers) == 1)
+    sub = next(iter(bridge.subscribers))
+
+    for i in range(2000):
+        bridge.publish(json.dumps({"lyric": "x" * 1000, "duration": i}).encode())
+    last = json.dumps({"lyric": "x" * 1000, "duration": 1999}).encode()
+    wait_for(lambda: bridge.current == last)
+
+    assert bridge.dropped > 0
+    # 每个订阅者最多积压一帧，传输层缓冲不超过上限加一帧
+    frame_size = len(last) + 8
+    assert sub.writer.transport.get_write_buffer_size() <= LyricBridge.WRITE_BUFFER_HIGH + frame_size
+    assert sub.pending is None or sub.pending.endswith(last + b"\n\n")
+    slow.close()
+
+
+def test_disconnect_unsubscribes(bridge):
+    sse, _ = open_sse(bridge)
+    ws, rest = open_ws(bridge)
+    wait_for(lambda: len(bridge.subscribers) == 2)
+
+    sse.close()
+    ws.sendall(client_frame(0x8, struct.pack("!H", 1000)))
+    assert recv_until(ws, b"\x03\xe8", rest) == encode_ws_frame(struct.pack("!H", 1000), opcode=0x8)
+    wait_for(lambda: not bridge.subscribers)
+
+
+def test_ws_ping_gets_pong(bridge):
+    ws, rest = open_ws(bridge)
+    ws.sendall(client_frame(0x9, b"hi"))
+    assert recv_until(ws, b"hi", rest) == encode_ws_frame(b"hi", opcode=0xA)
+
+
+@pytest.mark.parametrize("frame", [
+    # 未加掩码的帧
+    bytes([0x89, 0x02]) + b"hi",
+    # 声明 64 位长度的超大帧
+    bytes([0x81, 0xFF]) + struct.pack("!Q", 1 << 40),
+])
+def test_ws_rejects_invalid_client_frames(bridge, frame):
+    ws, rest = open_ws(bridge)
+    wait_for(lambda: len(bridge.subscribers) == 1)
+
+    ws.sendall(frame)
+    assert recv_until(ws, b"\x03\xea", rest) == encode_ws_frame(struct.pack("!H", 1002), opcode=0x8)
+    wait_for(lambda: not bridge.subscribers)
+
+
+def test_sse_discards_client_input(bridge):
+    sse, rest = open_sse(bridge)
+    wait_for(lambda: len(bridge.subscribers) == 1)
+
+    sse.sendall(b"x" * 1_000_000)
+    bridge.publish(b'{"lyric": "b", "duration": 1}')
+    assert recv_until(sse, b"\n\n", rest) == b'data: {"lyric": "b", "duration": 1}\n\n'
+
+
+def test_close_stops_server():
+    bridge = LyricBridge(port=0)
+    assert bridge.start()
+    sse, _ = open_sse(bridge)
+    wait_for(lambda: len(bridge.subscribers) == 1)
+
+    bridge.close()
+    assert not bridge.thread.is_alive()
+    assert sse.recv(1) == b""
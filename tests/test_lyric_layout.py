@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt5.QtWidgets")
+
+from PyQt5.QtGui import QFont  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from ui.lyricLayout import LAYOUT_HITS, LyricLayoutCache, SCROLL_MARGIN  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # 测量字体需要 QApplication，且在测试期间必须保持存活
+    yield QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def font(qapp):
+    font = QFont("DengXian")
+    font.setPixelSize(50)
+    return font
+
+
+def test_layout_centres_short_lines(font):
+    cache = LyricLayoutCache()
+    layout = cache.layout("a", font, 10000)
+    assert layout.endX is None
+    assert layout.scrollDistance == 0
+    assert layout.startX == (10000 - layout.width) // 2
+
+
+def test_layout_scrolls_long_lines(font):
+    cache = LyricLayoutCache()
+    layout = cache.layout("a long lyric line", font, 20)
+    assert layout.startX == SCROLL_MARGIN
+    assert layout.endX == 20 - layout.width - SCROLL_MARGIN
+    assert layout.scrollDistance == layout.width + 2 * SCROLL_MARGIN - 20
+
+
+def test_repeated_line_hits_cache(font):
+    cache = LyricLayoutCache()
+    hits = LAYOUT_HITS.value
+    first = cache.layout("a", font, 800)
+    assert cache.layout("a", font, 800) is first
+    # 部件宽度不同时需要重新排版
+    cache.layout("a", font, 400)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.hitRate == pytest.approx(1 / 3)
+    assert LAYOUT_HITS.value == hits + 1
+
+
+def test_lru_eviction(font):
+    cache = LyricLayoutCache(maxsize=2)
+    cache.layout("a", font, 800)
+    cache.layout("b", font, 800)
+    # 访问 a 后，最久未使用的是 b
+    cache.layout("a", font, 800)
+    cache.layout("c", font, 800)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+    misses = cache.misses
+    cache.layout("a", font, 800)
+    assert cache.misses == misses
+    cache.layout("b", font, 800)
+    assert cache.misses == misses + 1
+
+
+def test_warm_does_not_touch_hit_statistics(font):
+    cache = LyricLayoutCache()
+    cache.layout("a", font, 800)
+    before = (cache.hits, cache.misses)
+
+    assert cache.warm(["a", "b", "c"], font, 800) == 2
+    assert (cache.hits, cache.misses) == before
+
+    cache.layout("b", font, 800)
+    assert cache.hits == before[0] + 1
+
+
+def test_warm_skips_non_str_entries(font):
+    cache = LyricLayoutCache()
+    assert cache.warm(["a", None, 1, {"lyric": "b"}, ""], font, 800) == 1
+    assert cache.stats()["size"] == 1
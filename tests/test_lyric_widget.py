@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt5.QtWidgets")
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from ui.lyricWidget import LyricWidget  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    yield QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def widget(qapp):
+    widget = LyricWidget()
+    widget.resize(1200, 110)
+    yield widget
+    widget.deleteLater()
+
+
+def test_new_line_rebuilds_animation(widget):
+    widget.setLyric(["a"], [1000])
+    widget.setPlay(True)
+    widget.maskWidthAni.setCurrentTime(500)
+
+    widget.setLyric(["b"], [1000])
+    assert widget.lyric == "b"
+    assert widget.getMaskWidth() == 0
+    assert widget.maskWidthAni.state() == widget.maskWidthAni.Stopped
+
+
+def test_duration_change_keeps_progress(widget):
+    widget.setLyric(["a"], [1000])
+    widget.setPlay(True)
+    widget.maskWidthAni.setCurrentTime(250)
+    mask = widget.getMaskWidth()
+
+    widget.setLyric(["a"], [2000])
+    widget.setPlay(True)
+    ani = widget.maskWidthAni
+    assert ani.state() == ani.Running
+    assert ani.duration() == 2000
+    assert ani.currentTime() == 500
+    assert widget.getMaskWidth() == pytest.approx(mask)
+
+
+def test_finished_line_is_not_replayed(widget):
+    widget.setLyric(["a"], [1000])
+    widget.setPlay(True)
+    ani = widget.maskWidthAni
+    ani.setCurrentTime(1000)
+    assert ani.state() == ani.Stopped
+    full = widget.getMaskWidth()
+
+    widget.setLyric(["a"], [3000])
+    widget.setPlay(True)
+    assert ani.state() == ani.Stopped
+    assert widget.getMaskWidth() == full
+
+    # 换成新歌词后仍会正常播放
+    widget.setLyric(["b"], [1000])
+    widget.setPlay(True)
+    assert ani.state() == ani.Running
@@ -0,0 +1,89 @@
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils.metrics import MetricsRegistry, MetricsServer
+
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+
+def test_counter_sums_across_threads(metrics):
+    counter = metrics.counter("test_total", "测试计数")
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc(5)
+
+    assert counter.value == 40005
+    assert "test_total 40005" in metrics.render()
+
+
+def test_gauge_keeps_last_value(metrics):
+    gauge = metrics.gauge("test_depth", "测试队列长度")
+    gauge.set(3)
+    gauge.set(1.5)
+    assert "test_depth 1.5" in metrics.render()
+
+
+def test_histogram_buckets_are_cumulative(metrics):
+    histogram = metrics.histogram("test_seconds", "测试耗时", buckets=(0.1, 1))
+    # 恰好等于上界的值落入该桶
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value)
+
+    lines = metrics.render().splitlines()
+    assert lines[:2] == ["# HELP test_seconds 测试耗时", "# TYPE test_seconds histogram"]
+    assert lines[2:] == [
+        'test_seconds_bucket{le="0.1"} 2',
+        'test_seconds_bucket{le="1"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        "test_seconds_sum 2.65",
+        "test_seconds_count 4",
+    ]
+    assert histogram.count == 4
+
+
+def test_same_name_returns_same_metric(metrics):
+    assert metrics.counter("test_total", "测试") is metrics.counter("test_total", "测试")
+
+
+def test_kind_conflict_raises(metrics):
+    metrics.counter("test_total", "测试")
+    with pytest.raises(ValueError):
+        metrics.gauge("test_total", "测试")
+
+
+def test_summary_lists_metrics(metrics):
+    metrics.counter("test_total", "测试计数").inc(2)
+    metrics.histogram("test_seconds", "测试耗时").observe(0.002)
+    assert metrics.summary().splitlines() == ["测试计数: 2", "测试耗时: 1 次，平均 2.00 ms"]
+
+
+def test_server_serves_metrics(metrics):
+    metrics.counter("test_total", "测试").inc()
+    server = MetricsServer(port=0, metrics=metrics)
+    assert server.start()
+    try:
+        url = f"http://127.0.0.1:{server.port}"
+        with urllib.request.urlopen(f"{url}/metrics", timeout=2) as response:
+            assert response.status == 200
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert "test_total 1" in response.read().decode()
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{url}/other", timeout=2)
+        assert error.value.code == 404
+    finally:
+        server.close()
@@ -0,0 +1,137 @@
+import pytest
+
+from utils.throttle import LyricCoalescer, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_token_bucket_limits_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.wait_time() == pytest.approx(0.5)
+
+    clock.advance(0.25)
+    assert bucket.wait_time() == pytest.approx(0.25)
+    assert not bucket.try_acquire()
+
+    clock.advance(0.25)
+    assert bucket.wait_time() == 0.0
+    assert bucket.try_acquire()
+
+
+def test_token_bucket_caps_at_capacity(clock):
+    bucket = TokenBucket(rate=10, capacity=1, clock=clock)
+    clock.advance(100)
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+@pytest.mark.parametrize("rate", [0, -1])
+def test_token_bucket_rejects_non_positive_rate(clock, rate):
+    with pytest.raises(ValueError):
+        TokenBucket(rate=rate, capacity=1, clock=clock)
+
+
+def test_coalescer_rejects_non_positive_rate(clock):
+    with pytest.raises(ValueError):
+        LyricCoalescer(rate=0, clock=clock)
+
+
+def test_line_is_sent_after_settling(clock):
+    coalescer = LyricCoalescer(settle=0.1, clock=clock)
+    coalescer.submit("a")
+    assert coalescer.poll() is None
+    assert coalescer.next_deadline() == pytest.approx(0.1)
+
+    clock.advance(0.1)
+    coalescer.submit("a")
+    assert coalescer.poll() == "a"
+    assert coalescer.next_deadline() is None
+
+    # 已发送的歌词再次读到不会重复发送，也不计为抑制
+    coalescer.submit("a")
+    assert coalescer.poll() is None
+    assert coalescer.stats() == {"sent": 1, "suppressed": 0, "rate_limited": 0}
+
+
+def test_unsettled_lines_are_suppressed(clock):
+    coalescer = LyricCoalescer(settle=0.1, clock=clock)
+    coalescer.submit("a")
+    clock.advance(0.05)
+    coalescer.submit("ab")
+    clock.advance(0.05)
+    coalescer.submit("b")
+    assert coalescer.poll() is None
+    assert coalescer.next_deadline() == pytest.approx(0.1)
+
+    clock.advance(0.1)
+    assert coalescer.poll() == "b"
+    assert coalescer.stats() == {"sent": 1, "suppressed": 2, "rate_limited": 0}
+
+
+def test_flicker_back_to_last_sent_is_suppressed(clock):
+    coalescer = LyricCoalescer(settle=0.1, clock=clock)
+    coalescer.submit("a")
+    clock.advance(0.1)
+    assert coalescer.poll() == "a"
+
+    coalescer.submit("x")
+    clock.advance(0.05)
+    coalescer.submit("a")
+    assert coalescer.pending is None
+    assert coalescer.next_deadline() is None
+
+    clock.advance(1)
+    assert coalescer.poll() is None
+    assert coalescer.stats() == {"sent": 1, "suppressed": 1, "rate_limited": 0}
+
+
+def test_rate_limit_defers_line_and_counts_it_once(clock):
+    coalescer = LyricCoalescer(settle=0, rate=1, burst=1, clock=clock)
+    coalescer.submit("a")
+    assert coalescer.poll() == "a"
+
+    coalescer.submit("b")
+    # 周期刷新与提前刷新会多次轮询同一行
+    for _ in range(3):
+        assert coalescer.poll() is None
+    assert coalescer.stats()["rate_limited"] == 1
+    assert coalescer.next_deadline() == pytest.approx(1)
+
+    clock.advance(0.5)
+    assert coalescer.poll() is None
+    assert coalescer.next_deadline() == pytest.approx(0.5)
+
+    clock.advance(0.5)
+    assert coalescer.poll() == "b"
+    assert coalescer.stats() == {"sent": 2, "suppressed": 0, "rate_limited": 1}
+
+
+def test_next_deadline_waits_for_settle_and_token(clock):
+    coalescer = LyricCoalescer(settle=0.1, rate=2, burst=1, clock=clock)
+    coalescer.submit("a")
+    clock.advance(0.1)
+    assert coalescer.poll() == "a"
+
+    coalescer.submit("b")
+    # 稳定还需 0.1 秒，令牌还需 0.5 秒，取较晚者
+    assert coalescer.next_deadline() == pytest.approx(0.5)
+    clock.advance(0.5)
+    assert coalescer.next_deadline() == 0.0
+    assert coalescer.poll() == "b"
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from PyQt5.QtGui import QFont, QFontMetrics
+
+from utils.metrics import registry
+
+LAYOUT_HITS = registry.counter("lyricsync_layout_cache_hits_total", "歌词排版缓存命中次数")
+LAYOUT_MISSES = registry.counter("lyricsync_layout_cache_misses_total", "歌词排版缓存未命中次数")
+LAYOUT_EVICTIONS = registry.counter("lyricsync_layout_cache_evictions_total", "歌词排版缓存淘汰次数")
+
+# 歌词过长需要滚动时，两端保留的边距
+SCROLL_MARGIN = 10
+
+
+@dataclass(frozen=True)
+class LyricLayout:
+    """单行歌词在给定宽度部件中的排版结果"""
+    # 文本像素宽度
+    width: int
+    # 初始水平位置（居中偏移或滚动起点）
+    startX: int
+    # 滚动终点，不需要滚动时为 None
+    endX: Optional[int]
+
+    @property
+    def scrollDistance(self) -> int:
+        """滚动距离，不滚动时为 0"""
+        return 0 if self.endX is None else self.startX - self.endX
+
+
+class LyricLayoutCache:
+    """
+    歌词测量与排版缓存。
+
+    以 (文本, 字体, 字号, 部件宽度) 为键的 LRU 缓存，保存文本宽度、
+    居中偏移和滚动距离，避免切换歌词时在 UI 线程上重复测量。
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._layouts: "OrderedDict[Tuple[str, str, int, int], LyricLayout]" = OrderedDict()
+        self._metrics: Dict[Tuple[str, int], QFontMetrics] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def layout(self, text: str, font: QFont, areaWidth: int) -> LyricLayout:
+        """获取排版结果，未命中时测量并缓存"""
+        layout, hit = self._lookup(text, font, areaWidth)
+        if hit:
+            self.hits += 1
+            LAYOUT_HITS.inc()
+        else:
+            self.misses += 1
+            LAYOUT_MISSES.inc()
+        return layout
+
+    def warm(self, lines: Iterable[str], font: QFont, areaWidth: int) -> int:
+        """
+        预先测量即将显示的歌词，返回新测量的行数。
+        预热不计入命中率统计，非字符串的条目会被忽略。
+        """
+        warmed = 0
+        for text in lines:
+            if text and isinstance(text, str):
+                warmed += not self._lookup(text, font, areaWidth)[1]
+        return warmed
+
+    def _lookup(self, text: str, font: QFont, areaWidth: int) -> Tuple[LyricLayout, bool]:
+        """查找或测量排版结果，返回 (排版结果, 是否命中)"""
+        key = (text, font.family(), font.pixelSize(), areaWidth)
+        layout = self._layouts.get(key)
+        if layout is not None:
+            self._layouts.move_to_end(key)
+            return layout, True
+
+        layout = self._measure(text, font, areaWidth)
+        self._layouts[key] = layout
+        if len(self._layouts) > self.maxsize:
+            self._layouts.popitem(last=False)
+            self.evictions += 1
+            LAYOUT_EVICTIONS.inc()
+        return layout, False
+
+    def _measure(self, text: str, font: QFont, areaWidth: int) -> LyricLayout:
+        fontKey = (font.family(), font.pixelSize())
+        fontMetrics = self._metrics.get(fontKey)
+        if fontMetrics is None:
+            fontMetrics = self._metrics[fontKey] = QFontMetrics(font)
+        w = fontMetrics.width(text)
+
+        # 如果歌词长度超过窗口宽度，需要滚动显示，否则居中
+        if w > areaWidth:
+            return LyricLayout(w, SCROLL_MARGIN, areaWidth - w - SCROLL_MARGIN)
+        return LyricLayout(w, (areaWidth - w) // 2, None)
+
+    @property
+    def hitRate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        """命中率统计"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._layouts),
+            "hit_rate": self.hitRate,
+        }
+
+    def clear(self):
+        self._layouts.clear()
+        self._metrics.clear()
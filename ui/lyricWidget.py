@@ -1,18 +1,28 @@
-from PyQt5.QtCore import QPointF, QPropertyAnimation, Qt, pyqtProperty
+from PyQt5.QtCore import QPointF, QPropertyAnimation, QRectF, Qt, pyqtProperty
 from PyQt5.QtGui import (
-    QColor, QFont, QFontMetrics,
+    QColor, QFont,
     QPainter, QPainterPath, QPen
 )
 from typing import List
+import time
 from dataclasses import dataclass
 from PyQt5.QtWidgets import QWidget
 from config import config
+from ui.lyricLayout import LyricLayoutCache
+from utils.metrics import registry
 import logging
 
 log = logging.getLogger(__name__)
 
+PAINT_SECONDS = registry.histogram("lyricsync_paint_seconds", "歌词绘制耗时")
+PATH_BUILDS = registry.counter("lyricsync_path_builds_total", "歌词路径构建次数")
+FPS = registry.gauge("lyricsync_fps", "歌词绘制帧率")
+
 @dataclass
 class LyricWidget(QWidget):
+    # 所有歌词部件共享的测量缓存
+    layoutCache = LyricLayoutCache()
+
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         self.setAttribute(Qt.WA_TranslucentBackground)
@@ -24,53 +34,78 @@ class LyricWidget(QWidget):
         self.__maskWidth = 0
         # 歌词在部件中的水平位置
         self.__textX = 0
+        # 按 (字体, 字号) 缓存的字体对象
+        self.__font = None
+        self.__fontKey = None
+        # 当前歌词的排版结果，用于判断新歌词是否只需要重新计时
+        self.__layout = None
+        # 当前歌词的动画是否已播放完，播放完的歌词不会因重复收到而重新播放
+        self.__finished = False
+        # 以原点为起点的歌词路径，绘制时平移到 textX，歌词或字体变化时重建
+        self.__textPath = None
+        self.__textPathKey = None
+        # 帧率统计窗口，只统计高亮动画运行期间的绘制
+        self.__fpsFrames = 0
+        self.__fpsSince = time.perf_counter()
         
         # 初始化动画对象
         self.maskWidthAni = QPropertyAnimation(self, b'maskWidth', self)
         self.textXAni = QPropertyAnimation(self, b'textX', self)
+        self.maskWidthAni.stateChanged.connect(self.__onAnimationStateChanged)
+        self.maskWidthAni.finished.connect(self.__onAnimationFinished)
 
     def paintEvent(self, e):
         """绘制歌词"""
         if not self.lyric:
             return
 
+        start = time.perf_counter()
         painter = QPainter(self)
         painter.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing)
 
         # 绘制歌词
-        self.__drawLyric(
-            painter,
-            self.__textX,
-            config["lyric.font-size"],
-            self.__maskWidth,
-            self.lyricFont,
-            self.lyric
-        )
-
-    def __drawLyric(self, painter: QPainter, x, y, width, font: QFont, text: str):
-        """绘制单行歌词"""
-        painter.setFont(font)
+        painter.translate(self.__textX, 0)
+        self.__drawLyric(painter, self.__maskWidth, self.__getTextPath())
+        painter.end()
 
+        end = time.perf_counter()
+        PAINT_SECONDS.observe(end - start)
+        if self.maskWidthAni.state() != self.maskWidthAni.Running:
+            return
+        self.__fpsFrames += 1
+        if end - self.__fpsSince >= 1:
+            FPS.set(self.__fpsFrames / (end - self.__fpsSince))
+            self.__fpsFrames = 0
+            self.__fpsSince = end
+
+    def __onAnimationStateChanged(self, newState, oldState):
+        """动画开始时重置帧率窗口，暂停或结束时帧率归零"""
+        self.__fpsFrames = 0
+        self.__fpsSince = time.perf_counter()
+        if newState != self.maskWidthAni.Running:
+            FPS.set(0)
+
+    def __getTextPath(self) -> QPainterPath:
+        """获取歌词路径，仅在歌词或字体变化时重新构建"""
+        key = (self.lyric, config["lyric.font-family"], config["lyric.font-size"])
+        if key != self.__textPathKey:
+            self.__textPath = QPainterPath()
+            self.__textPath.addText(QPointF(0, config["lyric.font-size"]), self.lyricFont, self.lyric)
+            self.__textPathKey = key
+            PATH_BUILDS.inc()
+        return self.__textPath
+
+    def __drawLyric(self, painter: QPainter, width, path: QPainterPath):
+        """绘制单行歌词"""
         # 绘制背景文本
-        path = QPainterPath()
-        path.addText(QPointF(x, y), font, text)
         painter.strokePath(path, QPen(
             QColor(*config["lyric.stroke-color"]), config["lyric.stroke-size"]))
         painter.fillPath(path, QColor(*config['lyric.font-color']))
 
-        # 绘制高亮文本
-        painter.fillPath(
-            self.__getMaskedLyricPath(path, width),
-            QColor(*config['lyric.highlight-color'])
-        )
-
-    def __getMaskedLyricPath(self, path: QPainterPath, width: float):
-        """获取遮罩后的歌词路径"""
-        subPath = QPainterPath()
+        # 绘制高亮文本，用裁剪代替路径求交
         rect = path.boundingRect()
-        rect.setWidth(width)
-        subPath.addRect(rect)
-        return path.intersected(subPath)
+        painter.setClipRect(QRectF(rect.x(), rect.y(), width, rect.height()))
+        painter.fillPath(path, QColor(*config['lyric.highlight-color']))
 
     def setLyric(self, lyric: list, duration: List[int], update=False):
         """设置歌词
@@ -88,9 +123,17 @@ class LyricWidget(QWidget):
         """
         if not lyric:
             return
-            
+
+        layout = self.layoutCache.layout(lyric[0], self.lyricFont, self.width())
+        if lyric[0] == self.lyric and layout == self.__layout:
+            # 歌词与排版都没变，只重新计时，不重建动画，画面不变也无需重绘
+            self.__retime(max(duration[0], 1))
+            return
+
         self.lyric = lyric[0]
         self.duration = max(duration[0], 1)
+        self.__layout = layout
+        self.__finished = False
         self.__maskWidth = 0
 
         # 停止正在运行的动画
@@ -98,24 +141,42 @@ class LyricWidget(QWidget):
             if ani.state() == ani.Running:
                 ani.stop()
 
-        # 处理歌词
-        fontMetrics = QFontMetrics(self.lyricFont)
-        w = fontMetrics.width(self.lyric)
-        
-        # 如果歌词长度超过窗口宽度，需要滚动显示
-        if w > self.width():
-            self.__textX = 10  # 起始位置
-            self.__setAnimation(self.textXAni, 10, self.width() - w - 10, self.duration)
+        # 宽度、居中偏移和滚动距离均来自测量缓存
+        self.__textX = layout.startX
+
+        if layout.endX is not None:
+            # 歌词长度超过窗口宽度，需要滚动显示
+            self.__setAnimation(self.textXAni, layout.startX, layout.endX, self.duration)
         else:
             # 歌词居中显示
-            self.__textX = (self.width() - w) // 2
             self.textXAni.setEndValue(None)  # 不需要滚动动画
 
-        self.__setAnimation(self.maskWidthAni, 0, w, self.duration)
+        self.__setAnimation(self.maskWidthAni, 0, layout.width, self.duration)
 
         if update:
             self.update()
 
+    def __retime(self, duration: int):
+        """
+        只修改动画时长。
+
+        运行或暂停中的动画按比例换算当前时间，高亮保持在原来的进度上，
+        剩余部分按新时长播放；已播放完的动画保持结束状态。
+        """
+        self.duration = duration
+        for ani in [self.maskWidthAni, self.textXAni]:
+            if ani.endValue() is None:
+                continue
+            if ani.state() == ani.Stopped:
+                ani.setDuration(duration)
+                continue
+            progress = ani.currentTime() / max(ani.duration(), 1)
+            ani.setDuration(duration)
+            ani.setCurrentTime(int(progress * duration))
+
+    def __onAnimationFinished(self):
+        self.__finished = True
+
     def __setAnimation(self, ani: QPropertyAnimation, start, end, duration: int):
         """设置动画参数"""
         if ani.state() == ani.Running:
@@ -128,7 +189,8 @@ class LyricWidget(QWidget):
     def setPlay(self, isPlay: bool):
         """设置播放状态"""
         for ani in [self.maskWidthAni, self.textXAni]:
-            if isPlay and ani.state() != ani.Running and ani.endValue() is not None:
+            if isPlay and ani.state() != ani.Running and ani.endValue() is not None \
+                    and not self.__finished:
                 ani.start()
             elif not isPlay and ani.state() == ani.Running:
                 ani.pause()
@@ -141,9 +203,12 @@ class LyricWidget(QWidget):
     @property
     def lyricFont(self):
         """获取歌词字体"""
-        font = QFont(config["lyric.font-family"])
-        font.setPixelSize(config["lyric.font-size"])
-        return font
+        key = (config["lyric.font-family"], config["lyric.font-size"])
+        if key != self.__fontKey:
+            self.__font = QFont(key[0])
+            self.__font.setPixelSize(key[1])
+            self.__fontKey = key
+        return self.__font
 
     # 属性定义
     def getMaskWidth(self):
@@ -0,0 +1,305 @@
+import asyncio
+import base64
+import hashlib
+import struct
+import threading
+import logging
+from typing import Optional, Set
+
+from utils.metrics import registry
+
+log = logging.getLogger(__name__)
+
+BRIDGE_DROPPED = registry.counter("lyricsync_bridge_frames_dropped_total", "广播桥因客户端过慢丢弃的帧")
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OVERLAY_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>
+body { margin: 0; background: transparent; }
+#lyric {
+    font: bold 48px sans-serif; color: #fff; text-align: center;
+    -webkit-text-stroke: 2px #000;
+}
+</style>
+</head>
+<body>
+<div id="lyric"></div>
+<script>
+new EventSource("/events").onmessage = function (e) {
+    document.getElementById("lyric").textContent = JSON.parse(e.data).lyric;
+};
+</script>
+</body>
+</html>
+""".encode()
+
+
+def encode_ws_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """
+    编码一个服务端 WebSocket 帧（服务端发出的帧不加掩码）。
+    """
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 1 << 16:
+        header += bytes([126]) + struct.pack("!H", length)
+    else:
+        header += bytes([127]) + struct.pack("!Q", length)
+    return header + payload
+
+
+class _Subscriber:
+    """
+    单个订阅者的发送槽。
+
+    槽里只保留最新一帧：客户端写入跟不上时，旧帧直接被覆盖（drop-to-latest），
+    不会无限堆积。
+    """
+
+    def __init__(self, kind: str, writer: asyncio.StreamWriter):
+        self.kind = kind
+        self.writer = writer
+        self.pending: Optional[bytes] = None
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def offer(self, frame: bytes):
+        if self.pending is not None:
+            self.dropped += 1
+        self.pending = frame
+        self.ready.set()
+
+    async def pump(self):
+        """把槽中的帧写给客户端，直到连接断开"""
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            frame, self.pending = self.pending, None
+            if frame is None:
+                continue
+            self.writer.write(frame)
+            await self.writer.drain()
+
+
+class LyricBridge:
+    """
+    本地歌词广播桥。
+
+    在后台线程中运行一个 asyncio HTTP 服务，把当前歌词推送给 OBS 浏览器源、
+    看板等本地消费者：
+
+    - ``GET /ws``      WebSocket 推送
+    - ``GET /events``  SSE 推送
+    - ``GET /lyric``   当前歌词 JSON
+    - ``GET /``        简单的歌词叠加页面
+
+    每行歌词只编码一次，同一份字节分发给所有订阅者。
+    """
+
+    # 单个客户端在传输层允许积压的字节数，超过后 drain() 会阻塞，新帧改为覆盖旧帧
+    WRITE_BUFFER_HIGH = 16 * 1024
+    # 客户端 WebSocket 帧的最大负载，与控制帧上限一致
+    MAX_CLIENT_FRAME = 125
+    # 单个请求允许的最大请求头数量
+    MAX_HEADERS = 64
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 31315):
+        self.host = host
+        self.port = port
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.thread: Optional[threading.Thread] = None
+        self.subscribers: Set[_Subscriber] = set()
+        self.current: Optional[bytes] = None
+        self.dropped = 0
+        self._started = threading.Event()
+
+    def start(self) -> bool:
+        """启动服务线程，成功后 ``self.port`` 为实际监听端口"""
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self._started.wait(5)
+        return self.server is not None
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port)
+            )
+            self.port = self.server.sockets[0].getsockname()[1]
+            log.info(f"歌词广播桥已监听 http://{self.host}:{self.port}/")
+        except Exception as e:
+            log.error(f"歌词广播桥启动失败: {e}")
+            self._started.set()
+            self.loop.close()
+            return
+        self._started.set()
+        self.loop.run_forever()
+
+        # 取消仍在推送的连接任务，让它们走完清理逻辑
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+
+    def publish(self, payload: bytes):
+        """
+        发布一行已序列化的歌词（JSON 字节），可在任意线程调用。
+        """
+        if self.loop is None or self.server is None:
+            return
+        self.loop.call_soon_threadsafe(self._fan_out, payload)
+
+    def _fan_out(self, payload: bytes):
+        self.current = payload
+        frames = {
+            "ws": encode_ws_frame(payload),
+            "sse": b"data: " + payload + b"\n\n",
+        }
+        for sub in self.subscribers:
+            before = sub.dropped
+            sub.offer(frames[sub.kind])
+            if sub.dropped != before:
+                self.dropped += 1
+                BRIDGE_DROPPED.inc()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writer.transport.set_write_buffer_limits(high=self.WRITE_BUFFER_HIGH)
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            for count in range(self.MAX_HEADERS + 1):
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                if count == self.MAX_HEADERS:
+                    self._respond(writer, "431 Request Header Fields Too Large", "text/plain", b"too many headers")
+                    await writer.drain()
+                    return
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) >= 2 else ""
+
+            if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._serve_ws(reader, writer, headers)
+            elif path == "/events":
+                await self._serve_sse(reader, writer)
+            elif path == "/lyric":
+                body = self.current or b"{}"
+                self._respond(writer, "200 OK", "application/json; charset=utf-8", body)
+            elif path == "/":
+                self._respond(writer, "200 OK", "text/html; charset=utf-8", OVERLAY_PAGE)
+            else:
+                self._respond(writer, "404 Not Found", "text/plain", b"not found")
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            log.error(f"处理广播桥请求失败: {e}")
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: str, content_type: str, body: bytes):
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Connection: close\r\n\r\n".encode() + body
+        )
+
+    async def _serve_sse(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream; charset=utf-8\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Access-Control-Allow-Origin: *\r\n"
+            b"Connection: keep-alive\r\n\r\n"
+        )
+        sub = _Subscriber("sse", writer)
+        if self.current is not None:
+            sub.offer(b"data: " + self.current + b"\n\n")
+        await self._serve_subscriber(sub, self._discard_input(reader))
+
+    async def _serve_ws(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: dict):
+        key = headers.get("sec-websocket-key", "").encode()
+        accept = base64.b64encode(hashlib.sha1(key + WS_GUID).digest()).decode()
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        sub = _Subscriber("ws", writer)
+        if self.current is not None:
+            sub.offer(encode_ws_frame(self.current))
+        await self._serve_subscriber(sub, self._read_ws(reader, writer))
+
+    async def _serve_subscriber(self, sub: _Subscriber, until_closed):
+        """注册订阅者并持续推送，直到客户端断开"""
+        self.subscribers.add(sub)
+        pump = asyncio.ensure_future(sub.pump())
+        closed = asyncio.ensure_future(until_closed)
+        try:
+            await asyncio.wait([pump, closed], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.subscribers.discard(sub)
+            for task in (pump, closed):
+                if task.done() and not task.cancelled():
+                    task.exception()  # 断开时的连接错误无需上抛
+                task.cancel()
+
+    @staticmethod
+    async def _discard_input(reader: asyncio.StreamReader):
+        """SSE 客户端不应再发数据，分块读取并丢弃，读到 EOF 即表示断开"""
+        while await reader.read(1024):
+            pass
+
+    async def _read_ws(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        读取客户端帧，只处理 ping 与 close，遇到 close 或 EOF 时返回。
+
+        客户端只需发送控制帧，未加掩码或超过 MAX_CLIENT_FRAME 的帧按协议错误断开。
+        """
+        while True:
+            head = await reader.readexactly(2)
+            opcode = head[0] & 0x0F
+            length = head[1] & 0x7F
+            if not head[1] & 0x80 or length > self.MAX_CLIENT_FRAME:
+                # 1002: 协议错误
+                writer.write(encode_ws_frame(struct.pack("!H", 1002), opcode=0x8))
+                return
+            mask = await reader.readexactly(4)
+            data = await reader.readexactly(length)
+            data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+            if opcode == 0x8:
+                writer.write(encode_ws_frame(data[:2], opcode=0x8))
+                return
+            if opcode == 0x9:
+                writer.write(encode_ws_frame(data, opcode=0xA))
+
+    def close(self):
+        """停止服务并断开所有订阅者"""
+        if self.loop is None or self.server is None:
+            return
+        loop = self.loop
+
+        def shutdown():
+            self.server.close()
+            loop.stop()
+
+        loop.call_soon_threadsafe(shutdown)
+        if self.thread:
+            self.thread.join(2)
+        log.info("已关闭歌词广播桥")
@@ -6,8 +6,14 @@ import pymem
 
 import logging
 
+from utils.metrics import registry
+
 log = logging.getLogger(__name__)
 
+MEMORY_READS = registry.counter("lyricsync_memory_reads_total", "内存读取次数")
+MEMORY_READ_FAILURES = registry.counter("lyricsync_memory_read_failures_total", "内存读取失败次数")
+POINTER_RESOLVES = registry.counter("lyricsync_pointer_resolves_total", "多级指针解析次数")
+
 @dataclass
 class MemoryHookTool:
     process_name: str
@@ -31,6 +37,7 @@ class MemoryHookTool:
         多级指针跳转，获取最终地址。
         完全模拟 CE 行为：如果 offsets 最后一项是 0，则只跳转到地址，不解引用最终地址。
         """
+        POINTER_RESOLVES.inc()
         kernel32 = ctypes.windll.kernel32
         addr = ctypes.c_ulong()
 
@@ -39,6 +46,7 @@ class MemoryHookTool:
 
         if not kernel32.ReadProcessMemory(self.game.process_handle, start_addr, ctypes.byref(addr), 4, None):
             log.error(f"[失败] 无法读取地址: {hex(start_addr)}")
+            MEMORY_READ_FAILURES.inc()
             return None
 
         for i, offset in enumerate(offsets):
@@ -51,6 +59,7 @@ class MemoryHookTool:
 
             if not kernel32.ReadProcessMemory(self.game.process_handle, next_addr, ctypes.byref(addr), 4, None):
                 log.error(f"[失败] 无法读取地址: {hex(next_addr)}")
+                MEMORY_READ_FAILURES.inc()
                 return None
 
         log.debug(f"[完成] 最终地址: {hex(addr.value)}")
@@ -60,10 +69,12 @@ class MemoryHookTool:
         """
         获取内存中的字节
         """
+        MEMORY_READS.inc()
         try:
             return self.game.read_bytes(address, size)
         except Exception as e:
             log.error(f"读取内存内容失败: {e}")
+            MEMORY_READ_FAILURES.inc()
             return None
 
     @staticmethod
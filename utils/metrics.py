@@ -0,0 +1,229 @@
+import bisect
+import threading
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+
+log = logging.getLogger(__name__)
+
+# 默认直方图分桶（秒），覆盖从亚毫秒到数百毫秒的耗时
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+
+class _Cells:
+    """
+    按线程分片的数值单元。
+
+    每个线程只写自己的分片，写入无需加锁；读取时汇总所有分片，
+    只有线程第一次写入注册分片时才会加锁。
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self.size
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            cells = list(self._cells)
+        return [sum(cell[i] for cell in cells) for i in range(self.size)]
+
+
+class Counter:
+    """单调递增计数器"""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._cells = _Cells(1)
+
+    def inc(self, amount: float = 1):
+        self._cells.cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format(self.value)}"]
+
+    def summary(self) -> str:
+        return _format(self.value)
+
+
+class Gauge:
+    """瞬时值，后写入的覆盖先写入的"""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format(self.value)}"]
+
+    def summary(self) -> str:
+        return _format(self.value)
+
+
+class Histogram:
+    """分桶直方图，记录观测值的分布、总和与次数"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # 分片布局: [各桶计数..., +Inf 桶计数, 总和, 次数]
+        self._cells = _Cells(len(self.buckets) + 3)
+
+    def observe(self, value: float):
+        cell = self._cells.cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    @property
+    def count(self) -> float:
+        return self._cells.totals()[-1]
+
+    def samples(self) -> List[str]:
+        totals = self._cells.totals()
+        lines = []
+        cumulative = 0.0
+        for bound, n in zip(self.buckets + (float("inf"),), totals):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else _format(bound)
+            lines.append(f'{self.name}_bucket{{le="{le}"}} {_format(cumulative)}')
+        lines.append(f"{self.name}_sum {_format(totals[-2])}")
+        lines.append(f"{self.name}_count {_format(totals[-1])}")
+        return lines
+
+    def summary(self) -> str:
+        totals = self._cells.totals()
+        count = totals[-1]
+        if not count:
+            return "0 次"
+        return f"{_format(count)} 次，平均 {totals[-2] / count * 1000:.2f} ms"
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    运行指标注册表。
+
+    各模块在导入时注册自己的指标，按名称去重；导出时按注册顺序输出。
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help: str, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指标 {name} 已注册为 {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get_or_create(Counter, name, help)
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._get_or_create(Gauge, name, help)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, buckets)
+
+    def render(self) -> str:
+        """以 Prometheus 文本格式导出所有指标"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """适合在界面中展示的简要文本"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(f"{metric.help}: {metric.summary()}" for metric in metrics)
+
+
+# 全局共享的指标注册表
+registry = MetricsRegistry()
+
+
+class MetricsServer:
+    """
+    在本机提供 ``GET /metrics`` 的 Prometheus 抓取端点。
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 31316,
+                 metrics: MetricsRegistry = registry):
+        self.host = host
+        self.port = port
+        self.metrics = metrics
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """启动服务线程，成功后 ``self.port`` 为实际监听端口"""
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self.server.daemon_threads = True
+        except Exception as e:
+            log.error(f"指标服务启动失败: {e}")
+            return False
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        log.info(f"指标服务已监听 http://{self.host}:{self.port}/metrics")
+        return True
+
+    def close(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            log.info("已关闭指标服务")
@@ -9,6 +9,14 @@ import subprocess
 import sys
 import os
 
+from utils.metrics import registry
+
+PACKETS_SENT = registry.counter("lyricsync_packets_sent_total", "发送的歌词包")
+PACKETS_RECEIVED = registry.counter("lyricsync_packets_received_total", "接收的歌词包")
+PACKETS_DROPPED = registry.counter("lyricsync_packets_dropped_total", "发送失败或无法解析的歌词包")
+QUEUE_DEPTH = registry.gauge("lyricsync_lyric_queue_depth", "待显示歌词队列长度")
+DECODE_SECONDS = registry.histogram("lyricsync_decode_seconds", "歌词包解码耗时")
+
 class LyricNetwork:
     MULTICAST_ADDR = '239.255.255.250'
     MULTICAST_PORT = 31314
@@ -20,6 +28,8 @@ class LyricNetwork:
         self.receive_thread = None
         self.running = True
         self.local_ip = None
+        # 可选的本地广播桥（utils.bridge.LyricBridge），歌词原样转发给本地订阅者
+        self.bridge = None
         
     def _get_local_ip(self) -> str:
         """获取本地IP地址"""
@@ -151,12 +161,37 @@ class LyricNetwork:
             try:
                 data, addr = self.sock.recvfrom(1024)
                 if not self.is_master:
-                    lyric_data = json.loads(data.decode())
+                    PACKETS_RECEIVED.inc()
+                    start = time.perf_counter()
+                    try:
+                        lyric_data = json.loads(data.decode())
+                    except ValueError as e:
+                        PACKETS_DROPPED.inc()
+                        log.warning(f"丢弃无法解析的歌词包 {addr}: {e}")
+                        continue
+                    DECODE_SECONDS.observe(time.perf_counter() - start)
+                    if not self._is_lyric_data(lyric_data):
+                        PACKETS_DROPPED.inc()
+                        log.warning(f"丢弃格式错误的歌词包 {addr}")
+                        continue
                     self.lyric_queue.put(lyric_data)
+                    QUEUE_DEPTH.set(self.lyric_queue.qsize())
+                    if self.bridge:
+                        self.bridge.publish(data)
                     log.debug(f"收到来自 {addr} 的歌词: {lyric_data['lyric'][:20]}...")
             except Exception as e:
                 log.error(f"接收歌词失败: {e}")
                 
+    @staticmethod
+    def _is_lyric_data(data) -> bool:
+        """检查歌词包是否为 {'lyric': str, 'duration': int} 的形式"""
+        return (
+            isinstance(data, dict)
+            and isinstance(data.get('lyric'), str)
+            and isinstance(data.get('duration'), int)
+            and not isinstance(data.get('duration'), bool)
+        )
+
     def send_lyric(self, lyric: str, duration: int = 3000) -> bool:
         """发送歌词"""
         if not self.is_master or not self.sock:
@@ -169,10 +204,14 @@ class LyricNetwork:
                 'timestamp': time.time()
             }).encode()
             self.sock.sendto(data, (self.MULTICAST_ADDR, self.MULTICAST_PORT))
+            PACKETS_SENT.inc()
+            if self.bridge:
+                self.bridge.publish(data)
             log.debug(f"发送歌词: {lyric[:20]}...")
             return True
         except Exception as e:
             log.error(f"发送歌词失败: {e}")
+            PACKETS_DROPPED.inc()
             return False
             
     def get_lyric(self) -> Optional[Tuple[str, int]]:
@@ -181,6 +220,7 @@ class LyricNetwork:
             if self.lyric_queue.empty():
                 return None
             data = self.lyric_queue.get_nowait()
+            QUEUE_DEPTH.set(self.lyric_queue.qsize())
             return data['lyric'], data['duration']
         except:
             return None
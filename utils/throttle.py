@@ -0,0 +1,120 @@
+import time
+import logging
+from typing import Callable, Optional
+
+from utils.metrics import registry
+
+log = logging.getLogger(__name__)
+
+SENDS_SUPPRESSED = registry.counter("lyricsync_sends_suppressed_total", "合并抑制的歌词发送")
+SENDS_RATE_LIMITED = registry.counter("lyricsync_sends_rate_limited_total", "因限速推迟的歌词发送")
+
+
+class TokenBucket:
+    """
+    令牌桶限速器。
+
+    以 ``rate`` 个/秒的速度补充令牌，最多积累 ``capacity`` 个。
+    """
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError(f"令牌补充速度必须大于 0: {rate}")
+        if capacity < 1:
+            raise ValueError(f"令牌桶容量至少为 1: {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        """尝试取出一个令牌"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """距离下一个令牌可用还需等待的秒数"""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class LyricCoalescer:
+    """
+    主设备发送前的歌词合并器。
+
+    酷我切换歌词时内存中会短暂出现中间状态，直接发送会让从设备收到多行
+    几乎相同的歌词。合并器只在一行歌词保持 ``settle`` 秒不变后才放行，
+    期间被新值覆盖（包括闪回到已发送歌词）的计为一次抑制；放行还受令牌桶限速。
+    """
+
+    def __init__(self, settle: float = 0.1, rate: float = 5.0, burst: int = 3,
+                 clock: Callable[[], float] = time.monotonic):
+        self.settle = settle
+        self.clock = clock
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.pending: Optional[str] = None
+        self.pending_since = 0.0
+        # 当前待发送歌词是否已因限速被计数，保证每行最多计一次
+        self.pending_deferred = False
+        self.last_sent: Optional[str] = None
+        # 统计
+        self.sent = 0
+        self.suppressed = 0
+        self.rate_limited = 0
+
+    def submit(self, lyric: str):
+        """提交一次读取到的歌词"""
+        if lyric == self.pending:
+            return
+        if self.pending is not None:
+            # 待发送的歌词还没稳定就被替换了
+            self.suppressed += 1
+            SENDS_SUPPRESSED.inc()
+            log.debug(f"合并未稳定的歌词: {self.pending[:20]}...")
+            self.pending = None
+        if lyric != self.last_sent:
+            self.pending = lyric
+            self.pending_since = self.clock()
+            self.pending_deferred = False
+
+    def poll(self) -> Optional[str]:
+        """返回已稳定且获得令牌的歌词，没有可发送的歌词时返回 None"""
+        if self.pending is None:
+            return None
+        if self.clock() - self.pending_since < self.settle:
+            return None
+        if not self.bucket.try_acquire():
+            if not self.pending_deferred:
+                self.pending_deferred = True
+                self.rate_limited += 1
+                SENDS_RATE_LIMITED.inc()
+            return None
+        lyric, self.pending = self.pending, None
+        self.last_sent = lyric
+        self.sent += 1
+        return lyric
+
+    def next_deadline(self) -> Optional[float]:
+        """距离待发送歌词可以放行还需等待的秒数，没有待发送歌词时返回 None"""
+        if self.pending is None:
+            return None
+        settle_left = self.pending_since + self.settle - self.clock()
+        return max(settle_left, self.bucket.wait_time(), 0.0)
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.sent,
+            "suppressed": self.suppressed,
+            "rate_limited": self.rate_limited,
+        }